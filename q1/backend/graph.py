@@ -9,10 +9,15 @@ from langchain.prompts import PromptTemplate
 from langchain_groq import ChatGroq as Groq
 from langchain.embeddings import OllamaEmbeddings
 from retreiver import get_compression_retriever
+from admission import backend_slot, check_deadline, LLM_MAX_RETRIES, LLM_REQUEST_TIMEOUT_SECONDS
 import numpy as np
 
 # Groq LLM
-llm = Groq(model="meta-llama/llama-4-scout-17b-16e-instruct")
+llm = Groq(
+    model="meta-llama/llama-4-scout-17b-16e-instruct",
+    request_timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+    max_retries=LLM_MAX_RETRIES,
+)
 
 # Shared retriever
 compression_retriever = get_compression_retriever()
@@ -33,7 +38,8 @@ decompose_chain = (decompose_prompt | llm | StrOutputParser())
 
 def split_query(state: RAGState):
     query = state["query"]
-    sub_questions = decompose_chain.invoke({"query": query})
+    with backend_slot("llm"):
+        sub_questions = decompose_chain.invoke({"query": query})
     # Convert to list
     sub_qs = [q.strip("-• \n") for q in sub_questions.split("\n") if q.strip()]
     return {**state, "sub_queries": sub_qs}
@@ -49,16 +55,17 @@ def cosine_similarity(a, b):
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
 def rag_for_subquery(sub_query: str) -> Dict[str, Any]:
-    docs = compression_retriever.base_retriever.get_relevant_documents(sub_query)  # skip compression for similarity
+    with backend_slot("embedding"):
+        docs = compression_retriever.base_retriever.get_relevant_documents(sub_query)  # skip compression for similarity
 
-    query_embedding = embedding_fn.embed_query(sub_query)
+        query_embedding = embedding_fn.embed_query(sub_query)
 
-    # Rerank docs based on similarity
-    scored_docs = []
-    for doc in docs:
-        doc_embedding = embedding_fn.embed_query(doc.page_content)
-        score = cosine_similarity(query_embedding, doc_embedding)
-        scored_docs.append((score, doc))
+        # Rerank docs based on similarity
+        scored_docs = []
+        for doc in docs:
+            doc_embedding = embedding_fn.embed_query(doc.page_content)
+            score = cosine_similarity(query_embedding, doc_embedding)
+            scored_docs.append((score, doc))
 
     # Sort by similarity score
     scored_docs.sort(key=lambda x: x[0], reverse=True)
@@ -72,13 +79,18 @@ def rag_for_subquery(sub_query: str) -> Dict[str, Any]:
         "Given the following context:\n\n{context}\n\nAnswer the question:\n{question}\nInclude sources in format [source]."
     )
     chain = (answer_prompt | llm | StrOutputParser())
-    answer = chain.invoke({"context": context, "question": sub_query})
+    with backend_slot("llm"):
+        answer = chain.invoke({"context": context, "question": sub_query})
 
     return {"sub_query": sub_query, "answer": answer, "sources": list(set(sources))}
 
 def rag_all(state: RAGState):
     sub_qs = state["sub_queries"]
-    results = [rag_for_subquery(q) for q in sub_qs]
+    results = []
+    for q in sub_qs:
+        # Stop between sub-queries once the request has timed out
+        check_deadline()
+        results.append(rag_for_subquery(q))
     return {**state, "answers": results}
 
 
@@ -8,6 +8,7 @@ from langchain_community.document_loaders import PyMuPDFLoader
 import os
 from chroma_client import get_vectorstore
 from langchain_community.document_loaders.csv_loader import CSVLoader
+from admission import backend_slot, check_deadline
 
 
 text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
@@ -17,7 +18,8 @@ def ingest_document(content: str, metadata: dict = None):
     document = Document(page_content=content, metadata=metadata)
     chunks = text_splitter.split_documents([document])
     db = get_vectorstore()
-    db.add_documents(chunks)
+    with backend_slot("embedding"):
+        db.add_documents(chunks)
     return {"status": "success", "chunks_added": len(chunks)}
 
 def ingest_pdf(file_path: str, metadata: dict = None):
@@ -27,6 +29,7 @@ def ingest_pdf(file_path: str, metadata: dict = None):
         loader = CSVLoader(file_path)
     else:
         loader = PyMuPDFLoader(file_path)
+    check_deadline()
     documents = loader.load()
     
     for doc in documents:
@@ -35,5 +38,6 @@ def ingest_pdf(file_path: str, metadata: dict = None):
     chunks = text_splitter.split_documents(documents)
 
     db = get_vectorstore()
-    db.add_documents(chunks)
+    with backend_slot("embedding"):
+        db.add_documents(chunks)
     return {"status": "success", "chunks_added": len(chunks)}
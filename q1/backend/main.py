@@ -1,10 +1,12 @@
 # main.py
 
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, Request
 from ingest import ingest_document, ingest_pdf
 from graph import run_graph_pipeline
+from admission import admit, client_key, INGEST_TIMEOUT_SECONDS
 from pydantic import BaseModel
 import shutil
+import asyncio
 import os
 from uuid import uuid4
 import uvicorn
@@ -22,28 +24,35 @@ class IngestInput(BaseModel):
     metadata: dict = {}
 
 @app.post("/ask")
-async def ask_query(input: QueryInput):
-    result = await run_graph_pipeline(input.query)
+async def ask_query(input: QueryInput, http_request: Request):
+    async with admit(client_key(http_request)):
+        result = await run_graph_pipeline(input.query)
     return {"response": result}
 
 @app.post("/ingest")
-async def upload_document(input: IngestInput):
-    result = ingest_document(input.content, input.metadata)
+async def upload_document(input: IngestInput, http_request: Request):
+    async with admit(client_key(http_request), timeout=INGEST_TIMEOUT_SECONDS):
+        result = await asyncio.to_thread(ingest_document, input.content, input.metadata)
     return result
 
 @app.post("/upload-pdf/")
-async def upload_pdf(file: UploadFile = File(...), source: str = Form(...), date: str = Form(...)):
+async def upload_pdf(http_request: Request, file: UploadFile = File(...), source: str = Form(...), date: str = Form(...)):
+    metadata = {"source": source, "date": date}
+    async with admit(client_key(http_request), timeout=INGEST_TIMEOUT_SECONDS):
+        # Runs entirely in the worker thread, so the file is removed even if the request times out
+        return await asyncio.to_thread(save_and_ingest_pdf, file, metadata)
+
+def save_and_ingest_pdf(file: UploadFile, metadata: dict):
     temp_filename = f"{uuid4().hex}_{file.filename}"
     file_path = os.path.join(UPLOAD_DIR, temp_filename)
 
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-
-    metadata = {"source": source, "date": date}
-    result = ingest_pdf(file_path, metadata)
-
-    os.remove(file_path)  # Optional: delete after ingestion
-    return result
+    try:
+        with open(file_path, "wb") as f:
+            shutil.copyfileobj(file.file, f)
+        return ingest_pdf(file_path, metadata)
+    finally:
+        if os.path.exists(file_path):
+            os.remove(file_path)
 
 
 
@@ -4,8 +4,13 @@ from langchain.retrievers import ContextualCompressionRetriever
 from langchain.embeddings import HuggingFaceEmbeddings
 from chroma_client import get_vectorstore
 from langchain_groq import ChatGroq
+from admission import LLM_MAX_RETRIES, LLM_REQUEST_TIMEOUT_SECONDS
 
-llm = ChatGroq(model="meta-llama/llama-4-scout-17b-16e-instruct")
+llm = ChatGroq(
+    model="meta-llama/llama-4-scout-17b-16e-instruct",
+    request_timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+    max_retries=LLM_MAX_RETRIES,
+)
 
 def get_compression_retriever():
     base_retriever = get_vectorstore().as_retriever(search_kwargs={"k": 8})
@@ -4,9 +4,15 @@ import streamlit as st
 import requests
 import os
 import pandas as pd
+from uuid import uuid4
 
 API_URL = "http://localhost:8000"  # Change if deploying
 
+# One of the backend's API_KEYS; lets it rate limit each browser session separately
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid4().hex
+HEADERS = {"X-API-Key": os.getenv("BACKEND_API_KEY"), "X-User-Id": st.session_state.session_id}
+
 st.set_page_config(page_title="Sports Analytics RAG", layout="wide")
 st.title("⚽ Sports Analytics RAG System")
 
@@ -25,7 +31,7 @@ if page == "Ask a Question":
             st.warning("Please enter a question.")
         else:
             with st.spinner("Thinking..."):
-                res = requests.post(f"{API_URL}/ask", json={"query": query})
+                res = requests.post(f"{API_URL}/ask", json={"query": query}, headers=HEADERS)
                 if res.status_code == 200:
                     st.success("Answer:")
                     st.markdown(res.json()["response"])
@@ -47,7 +53,7 @@ elif page == "Upload Text":
             st.warning("Please provide both content and source.")
         else:
             metadata = {"source": source, "date": str(date)}
-            res = requests.post(f"{API_URL}/ingest", json={"content": text_content, "metadata": metadata})
+            res = requests.post(f"{API_URL}/ingest", json={"content": text_content, "metadata": metadata}, headers=HEADERS)
             if res.status_code == 200:
                 st.success(f"✅ {res.json()['chunks_added']} chunks added to vector DB.")
             else:
@@ -70,7 +76,7 @@ elif page == "Upload PDF":
             with st.spinner("Uploading and processing..."):
                 files = {"file": (uploaded_file.name, uploaded_file, "application/pdf")}
                 data = {"source": source, "date": str(date)}
-                res = requests.post(f"{API_URL}/upload-pdf/", files=files, data=data)
+                res = requests.post(f"{API_URL}/upload-pdf/", files=files, data=data, headers=HEADERS)
                 if res.status_code == 200:
                     st.success(f"✅ {res.json()['chunks_added']} chunks added from PDF.")
                 else:
@@ -95,7 +101,7 @@ elif page == "Upload CSV":
                 csv_text = df.to_csv(index=False)
 
                 metadata = {"source": source, "date": str(date)}
-                res = requests.post(f"{API_URL}/upload-pdf", json={"content": csv_text, "metadata": metadata})
+                res = requests.post(f"{API_URL}/upload-pdf", json={"content": csv_text, "metadata": metadata}, headers=HEADERS)
                 if res.status_code == 200:
                     st.success(f"✅ {res.json()['chunks_added']} chunks added from CSV.")
                 else:
@@ -0,0 +1,301 @@
+import os
+import sys
+import math
+import time
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+from fastapi import HTTPException
+import redis.asyncio
+from redis.exceptions import RedisError
+
+if sys.version_info < (3, 11):
+    raise RuntimeError("admission control needs Python 3.11+ (asyncio.timeout)")
+
+# Token buckets; a rate of 0 or less disables that limit.
+# Per end user (or per API key when no user is named) for trusted callers
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", 1))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", 10))
+# Per client address for everyone else. Generous, since a frontend without an
+# API key sends all of its users' traffic from one address.
+ADDRESS_RATE_LIMIT_PER_SECOND = float(os.getenv("ADDRESS_RATE_LIMIT_PER_SECOND", 50))
+ADDRESS_RATE_LIMIT_BURST = int(os.getenv("ADDRESS_RATE_LIMIT_BURST", 200))
+RATE_LIMITS = {
+    "user": (RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST),
+    "key": (RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST),
+    "ip": (ADDRESS_RATE_LIMIT_PER_SECOND, ADDRESS_RATE_LIMIT_BURST),
+}
+
+def _env_set(name: str) -> set:
+    return {v.strip() for v in os.getenv(name, "").split(",") if v.strip()}
+
+# Comma-separated keys of trusted callers (e.g. the frontend); these may name the end user
+API_KEYS = _env_set("API_KEYS")
+# Comma-separated proxy addresses whose X-Forwarded-For is honoured
+TRUSTED_PROXIES = _env_set("TRUSTED_PROXIES")
+
+# Admission queue
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 32))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", 64))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("QUEUE_TIMEOUT_SECONDS", 5))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", 30))
+# Document ingestion gets its own, longer deadline; large files take minutes to parse
+INGEST_TIMEOUT_SECONDS = float(os.getenv("INGEST_TIMEOUT_SECONDS", 600))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", 2))
+# Worker threads for blocking pipeline calls: admitted requests run their blocking
+# steps one at a time and hold their slot until those finish, so one each is
+# enough, plus a few spare for the event loop's own use (e.g. DNS lookups)
+PIPELINE_THREADS = MAX_CONCURRENT_REQUESTS + 4
+
+# LLM client limits, so a single call and its retries fit inside the request deadline
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 1))
+LLM_REQUEST_TIMEOUT_SECONDS = REQUEST_TIMEOUT_SECONDS / (LLM_MAX_RETRIES + 1)
+
+# Global backend concurrency (shared by all requests in this process)
+BACKEND_SLOTS = {
+    "llm": threading.BoundedSemaphore(int(os.getenv("LLM_CONCURRENCY", 8))),
+    "embedding": threading.BoundedSemaphore(int(os.getenv("EMBEDDING_CONCURRENCY", 4))),
+    "reranker": threading.BoundedSemaphore(int(os.getenv("RERANKER_CONCURRENCY", 2))),
+}
+
+# Skip Redis for a while after it fails instead of paying the error on every request
+REDIS_RETRY_SECONDS = 5
+
+
+class DeadlineExceeded(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=504, detail="Request deadline exceeded")
+
+
+def _reject(status_code: int, detail: str, retry_after: int):
+    return HTTPException(status_code=status_code, detail=detail, headers={"Retry-After": str(retry_after)})
+
+
+# ---------- Deadlines ----------
+# Context variables are copied into asyncio.to_thread and LangChain executors,
+# so backend calls running in worker threads see the deadline of their request.
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+def remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def check_deadline():
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded()
+
+@contextmanager
+def backend_slot(name: str):
+    """Hold one of the global slots for an LLM / embedding / reranker call."""
+    check_deadline()
+    slots = BACKEND_SLOTS[name]
+    if not slots.acquire(timeout=remaining()):
+        raise DeadlineExceeded()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+# ---------- Rate limiting ----------
+# Token bucket kept in Redis so the limit holds across workers; refill uses the
+# Redis clock so workers don't need synchronised time.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+# Own async client, so the check never needs a worker thread; short timeouts so a
+# slow or unreachable Redis falls back fast instead of holding up admission
+redis_client = redis.asyncio.Redis.from_url(
+    os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_connect_timeout=0.5, socket_timeout=0.5
+)
+TOKEN_BUCKET_SCRIPT = redis_client.register_script(TOKEN_BUCKET_LUA)
+
+_local_buckets = {}
+_local_lock = threading.Lock()
+_redis_down_until = 0.0
+
+def _take_local(key: str, rate: float, burst: int) -> float:
+    now = time.monotonic()
+    with _local_lock:
+        if len(_local_buckets) > 10000:
+            # Drop buckets that have refilled completely; they hold no state
+            for k in [k for k, (_, ts, full_after) in _local_buckets.items() if now - ts > full_after]:
+                del _local_buckets[k]
+        tokens, ts, _ = _local_buckets.get(key, (burst, now, 0))
+        tokens = min(burst, tokens + (now - ts) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        _local_buckets[key] = (tokens, now, burst / rate)
+    return 1.0 if allowed else tokens
+
+async def take_token(key: str) -> float:
+    """Take one token for `key`; returns seconds to wait, 0 if allowed."""
+    global _redis_down_until
+    rate, burst = RATE_LIMITS[key.split(":", 1)[0]]
+    if rate <= 0:
+        return 0
+    tokens = None
+    if time.monotonic() >= _redis_down_until:
+        try:
+            allowed, left = await TOKEN_BUCKET_SCRIPT(keys=[f"ratelimit:{key}"], args=[rate, burst])
+            tokens = 1.0 if allowed else float(left)
+        except RedisError:
+            _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+    if tokens is None:
+        tokens = _take_local(key, rate, burst)
+    if tokens >= 1:
+        return 0
+    return (1 - tokens) / rate
+
+
+# ---------- Admission ----------
+_inflight = None
+_waiting = 0
+_work = contextvars.ContextVar("work", default=None)
+
+
+class _RequestWork:
+    """Worker threads started by one admitted request.
+
+    Threads can't be cancelled and keep running after the deadline fires, so
+    the request's in-flight slot is only released once its handler has
+    returned and all of its threads have finished.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._lock = threading.Lock()
+        self._threads = 0
+        self._closed = False
+
+    def started(self):
+        with self._lock:
+            self._threads += 1
+
+    def finished(self, _future=None):
+        with self._lock:
+            self._threads -= 1
+            release = self._closed and self._threads == 0
+        if release:
+            self._loop.call_soon_threadsafe(_inflight.release)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            release = self._threads == 0
+        if release:
+            _inflight.release()
+
+
+class _PipelineExecutor(ThreadPoolExecutor):
+    """Default executor that ties each worker thread to the request that started it."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        work = _work.get()
+        if work is None:
+            return super().submit(fn, *args, **kwargs)
+        work.started()
+        try:
+            future = super().submit(fn, *args, **kwargs)
+        except BaseException:
+            work.finished()
+            raise
+        future.add_done_callback(work.finished)
+        return future
+
+
+def _init_loop():
+    """Create the in-flight semaphore and pipeline executor on the server's loop."""
+    global _inflight
+    if _inflight is None:
+        _inflight = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # asyncio.to_thread and LangChain's run_in_executor both use the default executor
+        asyncio.get_running_loop().set_default_executor(_PipelineExecutor(max_workers=PIPELINE_THREADS))
+
+def client_address(http_request) -> str:
+    """Peer address, or the X-Forwarded-For client when the peer is a trusted proxy."""
+    # client is None when served over a Unix socket or by some ASGI setups
+    host = http_request.client.host if http_request.client else "unknown"
+    forwarded = http_request.headers.get("x-forwarded-for")
+    if forwarded and host in TRUSTED_PROXIES:
+        # Walk back past our own proxies; earlier entries are caller-controlled
+        for addr in reversed([a.strip() for a in forwarded.split(",")]):
+            if addr not in TRUSTED_PROXIES:
+                return addr
+    return host
+
+def client_key(http_request, user_id: Optional[str] = None) -> str:
+    """Rate-limit key for a request.
+
+    Callers with a configured X-API-Key are trusted to name the end user, via
+    `user_id` or X-User-Id, and get a bucket per user (per key if none is named).
+    Anything else the caller sends is ignored and the request is keyed by
+    address, so sending fresh ids can't buy fresh buckets.
+    """
+    api_key = http_request.headers.get("x-api-key")
+    if api_key in API_KEYS:
+        user_id = user_id or http_request.headers.get("x-user-id")
+        return f"user:{user_id}" if user_id else f"key:{api_key}"
+    return f"ip:{client_address(http_request)}"
+
+@asynccontextmanager
+async def admit(key: str, timeout: float = REQUEST_TIMEOUT_SECONDS):
+    """Rate limit, queue and set a deadline `timeout` seconds out for one request.
+
+    Rejects with 429 when `key` is out of tokens and with 503 when the queue is
+    full or a slot doesn't free up in time, both carrying Retry-After. Work that
+    runs past the deadline is cancelled with 504; its slot stays taken until any
+    worker threads it started have finished.
+    """
+    global _waiting
+    _init_loop()
+    # Shed before anything that can wait, so the overload answer is always fast
+    if _inflight.locked() and _waiting >= MAX_QUEUED_REQUESTS:
+        raise _reject(503, "Server overloaded", RETRY_AFTER_SECONDS)
+
+    wait = await take_token(key)
+    if wait:
+        raise _reject(429, "Rate limit exceeded", math.ceil(wait))
+
+    token = _deadline.set(time.monotonic() + timeout)
+    try:
+        _waiting += 1
+        try:
+            await asyncio.wait_for(_inflight.acquire(), timeout=min(QUEUE_TIMEOUT_SECONDS, remaining()))
+        except asyncio.TimeoutError:
+            raise _reject(503, "Server overloaded", RETRY_AFTER_SECONDS)
+        finally:
+            _waiting -= 1
+        work = _RequestWork()
+        work_token = _work.set(work)
+        try:
+            async with asyncio.timeout(remaining()):
+                yield
+        except TimeoutError:
+            raise DeadlineExceeded()
+        finally:
+            _work.reset(work_token)
+            work.close()
+    finally:
+        _deadline.reset(token)
@@ -1,10 +1,13 @@
 import redis
+from redis.exceptions import RedisError
 import json
 import hashlib
 # import os
 
 # Connect to Redis
-redis_client = redis.Redis(host="localhost", port=6379, db=0)
+# Short timeouts so a slow or unreachable Redis fails fast instead of hanging requests.
+# The cache is best effort: on Redis errors reads miss and writes are skipped.
+redis_client = redis.Redis(host="localhost", port=6379, db=0, socket_connect_timeout=0.5, socket_timeout=0.5)
 
 def _make_key(namespace: str, data: dict):
     hash_input = json.dumps(data, sort_keys=True)
@@ -14,28 +17,43 @@ def _make_key(namespace: str, data: dict):
 # Cache assessment
 def cache_assessment(request: dict, result: dict, ttl=3600):
     key = _make_key("assessment", request)
-    redis_client.setex(key, ttl, json.dumps(result))
+    try:
+        redis_client.setex(key, ttl, json.dumps(result))
+    except RedisError:
+        pass
 
 # Get cached assessment
 def get_cached_assessment(request: dict):
     key = _make_key("assessment", request)
-    result = redis_client.get(key)
+    try:
+        result = redis_client.get(key)
+    except RedisError:
+        return None
     return json.loads(result) if result else None
 
 # Cache context chunks
 def cache_chunks(topic: str, chunks: list[str], ttl=3600):
     key = f"chunks:{topic.lower()}"
-    redis_client.setex(key, ttl, json.dumps(chunks))
+    try:
+        redis_client.setex(key, ttl, json.dumps(chunks))
+    except RedisError:
+        pass
 
 def get_cached_chunks(topic: str):
     key = f"chunks:{topic.lower()}"
-    result = redis_client.get(key)
+    try:
+        result = redis_client.get(key)
+    except RedisError:
+        return None
     return json.loads(result) if result else None
 
 def get_user_difficulty(user_id: str) -> str:
     key = f"user_perf:{user_id}"
-    data = redis_client.hgetall(key)
-    
+    try:
+        data = redis_client.hgetall(key)
+    except RedisError:
+        return "medium"  # default
+
     correct = int(data.get(b"correct", 0))
     total = int(data.get(b"total", 0))
     
@@ -1,3 +1,4 @@
+import asyncio
 from cache import cache_assessment, get_cached_assessment
 from retriever import hybrid_retrieve
 from reranker import rerank
@@ -5,8 +6,14 @@ from langchain.prompts import PromptTemplate
 from langchain_groq import ChatGroq
 from tools import fetch_from_wikipedia
 from cache import get_user_difficulty
+from admission import backend_slot, LLM_MAX_RETRIES, LLM_REQUEST_TIMEOUT_SECONDS
 
-groq = ChatGroq(temperature=0.3, model_name="meta-llama/llama-4-scout-17b-16e-instruct")
+groq = ChatGroq(
+    temperature=0.3,
+    model_name="meta-llama/llama-4-scout-17b-16e-instruct",
+    request_timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+    max_retries=LLM_MAX_RETRIES,
+)
 
 PROMPT = PromptTemplate.from_template("""
 You are an expert assessment generator. Based on the context below and the topic: "{topic}", learning objectives: {objectives}, and difficulty: {difficulty},
@@ -18,33 +25,38 @@ Context:
 {context}
 """)
 
+def invoke_llm(chain, inputs):
+    with backend_slot("llm"):
+        return chain.invoke(inputs)
+
 async def generate_assessment(request):
+    # Blocking Redis, HTTP and backend calls run off the event loop so queued requests stay responsive
     # Step 1: Check Cache
-    cache_hit = get_cached_assessment(request.model_dump())
+    cache_hit = await asyncio.to_thread(get_cached_assessment, request.model_dump())
     if cache_hit:
         return {"cached": True, "assessment": cache_hit["assessment"]}
 
     # Step 2: Retrieve + Rerank
 
 # Step 2: Retrieve + Rerank
-    context_docs = hybrid_retrieve(request.topic)
+    context_docs = await asyncio.to_thread(hybrid_retrieve, request.topic)
 
     if not context_docs:
-        context = fetch_from_wikipedia(request.topic)
+        context = await asyncio.to_thread(fetch_from_wikipedia, request.topic)
     else:
-        reranked_docs = rerank(request.topic, context_docs)
+        reranked_docs = await asyncio.to_thread(rerank, request.topic, context_docs)
     context = "\n\n".join([doc.page_content for doc in reranked_docs])
 
     context = "\n\n".join([doc.page_content for doc in reranked_docs])
 
     difficulty = request.difficulty
     if difficulty == "auto":
-        difficulty = get_user_difficulty(request.user_id)
+        difficulty = await asyncio.to_thread(get_user_difficulty, request.user_id)
 
     print(context,"LLMCONTEXT")
     # Step 3: Generate
     chain = PROMPT | groq
-    result = chain.invoke({
+    result = await asyncio.to_thread(invoke_llm, chain, {
         "topic": request.topic,
         "objectives": request.objectives,
         "difficulty": difficulty,
@@ -52,5 +64,5 @@ async def generate_assessment(request):
     })
 
     response = {"assessment": result.content}
-    cache_assessment(request.model_dump(), response)
+    await asyncio.to_thread(cache_assessment, request.model_dump(), response)
     return response
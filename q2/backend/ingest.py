@@ -1,4 +1,5 @@
 import os
+import asyncio
 import uuid
 import tempfile
 # from langchain.embeddings import SentenceTransformerEmbeddings
@@ -6,29 +7,40 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_docling import DoclingLoader
 from chroma_client import get_vectorstore
 from langchain_community.vectorstores.utils import filter_complex_metadata
+from admission import backend_slot, check_deadline
 
 # Initialize vector store and embedding
 # EMBEDDINGS = SentenceTransformerEmbeddings(model_name="all-mpnet-base-v2")
 VECTORSTORE = get_vectorstore()
 
-async def process_and_store_doc(file):
-    contents = await file.read()
-    file_ext = os.path.splitext(file.filename)[-1]
+def store_doc(contents: bytes, file_ext: str):
     temp_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}{file_ext}")
 
-    with open(temp_path, "wb") as f:
-        f.write(contents)
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(contents)
+
+        # Load using Docling
+        loader = DoclingLoader(temp_path)
+        check_deadline()
+        documents = loader.load()
 
-    # Load using Docling
-    loader = DoclingLoader(temp_path)
-    documents = loader.load()
+        # Split text into chunks
+        splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+        chunks = splitter.split_documents(documents)
 
-    # Split text into chunks
-    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    chunks = splitter.split_documents(documents)
+        filtered_chunks = filter_complex_metadata(chunks)
+        # Store in Chroma
+        with backend_slot("embedding"):
+            VECTORSTORE.add_documents(filtered_chunks)
 
-    filtered_chunks = filter_complex_metadata(chunks)
-    # Store in Chroma
-    VECTORSTORE.add_documents(filtered_chunks)
+        return {"status": "success", "chunks": len(chunks)}
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
-    return {"status": "success", "chunks": len(chunks)}
+async def process_and_store_doc(file):
+    contents = await file.read()
+    file_ext = os.path.splitext(file.filename)[-1]
+    # Docling parsing is CPU-heavy; keep it off the event loop
+    return await asyncio.to_thread(store_doc, contents, file_ext)
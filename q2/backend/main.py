@@ -1,6 +1,7 @@
-from fastapi import FastAPI, UploadFile, Form, File
+from fastapi import FastAPI, UploadFile, Form, File, Request
 from ingest import process_and_store_doc
 from generator import generate_assessment
+from admission import admit, client_key, INGEST_TIMEOUT_SECONDS
 from pydantic import BaseModel
 from typing import List
 import uvicorn
@@ -14,12 +15,14 @@ class AssessmentRequest(BaseModel):
     user_id: str
 
 @app.post("/upload/")
-async def upload_doc(file: UploadFile = File(...)):
-    return await process_and_store_doc(file)
+async def upload_doc(http_request: Request, file: UploadFile = File(...)):
+    async with admit(client_key(http_request), timeout=INGEST_TIMEOUT_SECONDS):
+        return await process_and_store_doc(file)
 
 @app.post("/generate/")
-async def generate(request: AssessmentRequest):
-    return await generate_assessment(request)
+async def generate(request: AssessmentRequest, http_request: Request):
+    async with admit(client_key(http_request, request.user_id)):
+        return await generate_assessment(request)
 
 
 
@@ -3,6 +3,7 @@ from langchain.embeddings import SentenceTransformerEmbeddings
 from rank_bm25 import BM25Okapi
 from langchain_core.documents import Document
 from chroma_client import get_vectorstore
+from admission import backend_slot
 
 # Load dense vector store (Chroma)
 EMBEDDINGS = SentenceTransformerEmbeddings(model_name="all-mpnet-base-v2")
@@ -14,7 +15,8 @@ BM25_DOCS = None
 
 def build_sparse_index():
     global BM25_INDEX, BM25_DOCS
-    all_docs = VECTORSTORE.similarity_search("dummy", k=1000)  # Fetch large set
+    with backend_slot("embedding"):
+        all_docs = VECTORSTORE.similarity_search("dummy", k=1000)  # Fetch large set
     corpus = [doc.page_content for doc in all_docs]
     BM25_INDEX = BM25Okapi([doc.split(" ") for doc in corpus])
     BM25_DOCS = all_docs
@@ -25,7 +27,8 @@ def hybrid_retrieve(query: str, k=10) -> list[Document]:
     if BM25_INDEX is None:
         build_sparse_index()
 
-    dense_results = VECTORSTORE.similarity_search(query, k=k)
+    with backend_slot("embedding"):
+        dense_results = VECTORSTORE.similarity_search(query, k=k)
     
     sparse_scores = BM25_INDEX.get_scores(query.split())
     
@@ -3,6 +3,8 @@ import requests
 import os
 
 FASTAPI_URL = "http://localhost:8000"  # change if hosted elsewhere
+# One of the backend's API_KEYS; lets it rate limit by the user_id we send
+HEADERS = {"X-API-Key": os.getenv("BACKEND_API_KEY")}
 
 st.set_page_config(page_title="Smart Assessment Generator", layout="wide")
 st.title("🧠 Advanced Assessment Generator")
@@ -15,7 +17,7 @@ uploaded_file = st.file_uploader("Upload any document (PDF, DOCX, TXT, PPTX...)"
 if uploaded_file:
     with st.spinner("Uploading and processing..."):
         files = {"file": (uploaded_file.name, uploaded_file.getvalue())}
-        response = requests.post(f"{FASTAPI_URL}/upload/", files=files)
+        response = requests.post(f"{FASTAPI_URL}/upload/", files=files, headers=HEADERS)
 
         if response.status_code == 200:
             st.success(f"✅ Uploaded successfully. Chunks processed: {response.json().get('chunks')}")
@@ -42,7 +44,7 @@ if st.button("Generate Assessment"):
                 "user_id": user_id
             }
 
-            res = requests.post(f"{FASTAPI_URL}/generate/", json=payload)
+            res = requests.post(f"{FASTAPI_URL}/generate/", json=payload, headers=HEADERS)
             if res.status_code == 200:
                 data = res.json()
                 st.success("✅ Assessment Generated!")